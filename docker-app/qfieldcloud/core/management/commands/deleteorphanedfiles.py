@@ -1,11 +1,16 @@
-import uuid
-from typing import Set
+import re
+from typing import Dict, Set
+from uuid import UUID
 
 from django.core.management.base import BaseCommand
 from qfieldcloud.core import utils
 from qfieldcloud.core.models import Project
 from qfieldcloud.core.utils2 import storage
 
+UUID_REGEX = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
 
 class Command(BaseCommand):
     help = "Delete orphaned project files when the project in the DB is deleted."
@@ -14,41 +19,38 @@ class Command(BaseCommand):
         parser.add_argument("--dry-run", action="store_true")
         parser.add_argument("--limit", type=int, default=100)
 
-    def get_orphaned_project_ids(self, project_ids: Set[str]) -> Set[str]:
-        orphaned_project_ids = set()
-        existing_project_ids = Project.objects.filter(
-            id__in=list(project_ids),
-        ).values_list("id", flat=True)
-
-        if len(existing_project_ids) < len(project_ids):
-            existing_project_ids = [str(uid) for uid in existing_project_ids]
-
-            for project_id in project_ids:
-                if project_id not in existing_project_ids:
-                    orphaned_project_ids.add(project_id)
+    def get_orphaned_project_ids(self, project_ids: Dict[UUID, str]) -> Set[str]:
+        existing_project_ids = set(
+            Project.objects.filter(
+                id__in=project_ids.keys(),
+            ).values_list("id", flat=True)
+        )
 
-        return orphaned_project_ids
+        # NOTE return the project ids as listed in the storage, as they might differ from the `str(UUID)` form, e.g. in letter case
+        return {
+            project_id
+            for project_uuid, project_id in project_ids.items()
+            if project_uuid not in existing_project_ids
+        }
 
     def handle(self, *args, **options):
         dry_run = options.get("dry_run")
         limit = options.get("limit")
         bucket = utils.get_s3_bucket()
-        project_ids = set()
-        orphaned_project_ids = set()
+        project_ids: Dict[UUID, str] = {}
+        orphaned_project_ids: Set[str] = set()
 
         if dry_run:
             self.stdout.write("Dry run, no files will be deleted.")
 
-        for f in utils.list_files(bucket, "projects/", "projects/"):
-            project_id = f.name[:36]
+        for project_dir in utils.list_prefixes(bucket, "projects/", "projects/"):
+            project_id = project_dir.rstrip("/")
 
-            try:
-                uuid.UUID(project_id)
-            except Exception:
+            if not UUID_REGEX.match(project_id):
                 self.stdout.write(f"Invalid uuid: {str(project_id)}")
                 continue
 
-            project_ids.add(project_id)
+            project_ids[UUID(project_id)] = project_id
 
             # check for every `limit` projects if they exist, to keep the SQL query short and fast enough
             if len(project_ids) == limit:
@@ -56,7 +58,7 @@ class Command(BaseCommand):
                     f"Checking a batch of {limit} project ids from the storage..."
                 )
                 orphaned_project_ids |= self.get_orphaned_project_ids(project_ids)
-                project_ids = set()
+                project_ids = {}
 
         if len(project_ids) > 0:
             self.stdout.write(
@@ -1,6 +1,11 @@
+import sys
+
 from django.core.management.base import BaseCommand
 from qfieldcloud.core.utils import get_s3_bucket
 
+# number of version rows to collect before writing them to stdout at once
+WRITE_BUFFER_SIZE = 4096
+
 
 class Command(BaseCommand):
     """
@@ -32,34 +37,35 @@ class Command(BaseCommand):
         files_count = 0
         files_and_versions_b = 0
         files_and_versions_count = 0
-        last_files_count = 0
+        buffer: list[str] = []
         for version in bucket.object_versions.filter(Prefix=prefix):
+            size = version.size or 0
             files_and_versions_count += 1
-            files_and_versions_b += version.size or 0
+            files_and_versions_b += size
 
-            last_files_count = files_count
             if version.is_latest:
                 files_count += 1
-                files_b += version.size or 0
+                files_b += size
 
             if level in ("version", "file"):
                 if level == "version" or version.is_latest:
                     is_latest = "T" if version.is_latest else "F"
-                    print(
-                        version.id,
-                        str(version.last_modified),
-                        is_latest,
-                        version.e_tag,
-                        version.size,
-                        version.key,
-                        sep="\t",
+                    buffer.append(
+                        f"{version.id}\t{version.last_modified}\t{is_latest}\t{version.e_tag}\t{version.size}\t{version.key}\n"
                     )
+
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        sys.stdout.write("".join(buffer))
+                        buffer.clear()
             elif level in ("summary",):
-                if last_files_count != files_count and files_count % 10000 == 0:
+                if version.is_latest and files_count % 10000 == 0:
                     print(
                         f"Intermediate results. {files_count} files, {files_b / 1000 / 1000:.2f} MB; {files_and_versions_count} versions, {files_and_versions_b / 1000 / 1000:.5f} MB"
                     )
 
+        if buffer:
+            sys.stdout.write("".join(buffer))
+
         print(
             f"Final results. {files_count} files, {files_b / 1000 / 1000:.2f} MB; {files_and_versions_count} versions, {files_and_versions_b / 1000 / 1000:.5f} MB"
         )
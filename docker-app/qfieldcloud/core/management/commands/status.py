@@ -1,3 +1,4 @@
+from botocore.exceptions import BotoCoreError, ClientError
 from django.core.management.base import BaseCommand
 from qfieldcloud.core import geodb_utils, utils
 
@@ -16,8 +17,8 @@ class Command(BaseCommand):
         results["storage"] = "ok"
         # Check if bucket exists (i.e. the connection works)
         try:
-            utils.get_s3_bucket()
-        except Exception:
+            utils.check_s3_bucket()
+        except (BotoCoreError, ClientError):
             results["storage"] = "error"
 
         self.stdout.write(
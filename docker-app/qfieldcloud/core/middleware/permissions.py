@@ -0,0 +1,15 @@
+from qfieldcloud.core.permissions_utils import permissions_cache
+
+
+def cache_permissions(get_response):
+    """
+    Cache the user roles on projects and organizations for the lifetime of the request,
+    so repeated permission checks (e.g. permission class, view and serializer) hit the database only once.
+    """
+
+    def middleware(request):
+        with permissions_cache():
+            response = get_response(request)
+        return response
+
+    return middleware
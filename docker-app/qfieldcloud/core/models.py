@@ -15,11 +15,12 @@ from django.contrib.gis.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from django.db import transaction
-from django.db.models import Case, Exists, F, OuterRef, Q
+from django.db.models import Case, Exists, F, OuterRef, Q, Subquery
 from django.db.models import Value as V
 from django.db.models import When
 from django.db.models.aggregates import Count, Sum
 from django.db.models.fields.json import JSONField
+from django.db.models.functions import Coalesce
 from django.urls import reverse_lazy
 from django.utils.functional import cached_property
 from django.utils.safestring import SafeString, mark_safe
@@ -915,6 +916,35 @@ class ProjectQueryset(models.QuerySet):
 
         return qs
 
+    def with_direct_collaborators_count(self):
+        """Annotates the projects with the count of their direct collaborators, as `Project.direct_collaborators`.
+
+        The annotated value is used by `Project.direct_collaborators_count` instead of one `COUNT` query per project.
+        """
+        direct_collaborators = (
+            ProjectCollaborator.objects.skip_incognito()
+            .filter(
+                project=OuterRef("pk"),
+                collaborator__type=User.Type.PERSON,
+            )
+            .exclude(
+                # the organization owner for organization projects, the owner otherwise
+                collaborator_id=Coalesce(
+                    OuterRef("owner__organization__organization_owner_id"),
+                    OuterRef("owner_id"),
+                    output_field=models.IntegerField(),
+                ),
+            )
+            .order_by()
+            .values("project")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+
+        return self.annotate(
+            _direct_collaborators_count=Coalesce(Subquery(direct_collaborators), 0)
+        )
+
 
 class Project(models.Model):
     """Represent a QFieldcloud project.
@@ -1285,7 +1315,7 @@ class Project(models.Model):
                 not self.is_public
                 and max_premium_collaborators_per_private_project != -1
                 and max_premium_collaborators_per_private_project
-                < self.direct_collaborators.count()
+                < self.direct_collaborators_count
             ):
                 status = Project.Status.FAILED
                 status_code = Project.StatusCode.TOO_MANY_COLLABORATORS
@@ -1308,6 +1338,15 @@ class Project(models.Model):
         else:
             return 100
 
+    @property
+    def direct_collaborators_count(self) -> int:
+        """Returns the count of `direct_collaborators`, preferring the value annotated by `ProjectQueryset.with_direct_collaborators_count()`."""
+        count = getattr(self, "_direct_collaborators_count", None)
+        if count is None:
+            count = self.direct_collaborators.count()
+
+        return count
+
     @property
     def direct_collaborators(self):
         if self.owner.is_organization:
@@ -1,30 +1,16 @@
 from itertools import islice
-from typing import Any, Callable
+from typing import Any
 
 from django.conf import settings
 from rest_framework import pagination, response
 
 
-def parameterize_pagination(_class: type) -> Callable:
-    """
-    Set as class attributes the items passed as kwargs.
-    """
-
-    def configure_class_object(*args, **kwargs) -> type:
-        for k, v in kwargs.items():
-            setattr(_class, k, v)
-        return _class
-
-    return configure_class_object
-
-
-@parameterize_pagination
 class QfcLimitOffsetPagination(pagination.LimitOffsetPagination):
     """
     Based on LimitOffsetPagination.
     Custom implementation such that `response.data = LimitOffsetPagination.data.results` from DRF's blanket implementation.
     Inject pagination controls and counter into the response headers.
-    Can be customized when assigning `pagination_class`.
+    Can be customized by subclassing and overriding the class attributes.
     """
 
     def get_headers(self) -> dict[str, Any]:
@@ -51,7 +37,11 @@ class QfcLimitOffsetPagination(pagination.LimitOffsetPagination):
         """
         if self.request.GET.get("offset") and not self.request.GET.get("limit"):
             # slice serialized data to enforce the application wide limit
-            data = islice(data, settings.QFIELDCLOUD_API_DEFAULT_PAGE_LIMIT)
+            limit = settings.QFIELDCLOUD_API_DEFAULT_PAGE_LIMIT
+            if isinstance(data, list):
+                data = data[:limit]
+            else:
+                data = list(islice(data, limit))
 
         return response.Response(data, headers=self.get_headers())
 
@@ -1,4 +1,6 @@
-from typing import Literal
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Collection, Generator, Iterable, Literal
 
 from django.utils.translation import gettext as _
 from qfieldcloud.authentication.models import AuthToken
@@ -21,6 +23,81 @@ from qfieldcloud.subscription.exceptions import (
 )
 from qfieldcloud.subscription.models import Subscription
 
+# Maps `("project", user_pk, project_pk, skip_invalid)` and `("organization", user_pk, organization_pk)`
+# to the `(role, role_origin)` of the user, or `None` if the user has no role.
+# Active only within `permissions_cache()`, e.g. for the lifetime of a request.
+_roles_cache: ContextVar[dict[tuple, tuple[str, str] | None] | None] = ContextVar(
+    "roles_cache", default=None
+)
+
+_ALL_PROJECT_ROLES = frozenset(ProjectCollaborator.Roles)
+_PROJECT_MANAGEMENT_ROLES = frozenset(
+    {
+        ProjectCollaborator.Roles.ADMIN,
+        ProjectCollaborator.Roles.MANAGER,
+    }
+)
+_PROJECT_EDITING_ROLES = frozenset(
+    {
+        ProjectCollaborator.Roles.ADMIN,
+        ProjectCollaborator.Roles.MANAGER,
+        ProjectCollaborator.Roles.EDITOR,
+    }
+)
+_PROJECT_REPORTING_ROLES = _PROJECT_EDITING_ROLES | {ProjectCollaborator.Roles.REPORTER}
+_PROJECT_ADMIN_ROLES = frozenset({ProjectCollaborator.Roles.ADMIN})
+
+# Maps a project action to the project roles allowed to perform it.
+PROJECT_ACTION_ROLES: dict[str, frozenset[ProjectCollaborator.Roles]] = {
+    "access_project": _ALL_PROJECT_ROLES,
+    "update_project": _PROJECT_MANAGEMENT_ROLES,
+    "delete_project": _PROJECT_MANAGEMENT_ROLES,
+    "create_files": _PROJECT_REPORTING_ROLES,
+    "modify_projectfile": _PROJECT_REPORTING_ROLES,
+    "modify_restricted_projectfile": _PROJECT_MANAGEMENT_ROLES,
+    "read_files": _ALL_PROJECT_ROLES,
+    "delete_files": _PROJECT_EDITING_ROLES,
+    "delete_unnecessary_file_versions": _PROJECT_ADMIN_ROLES,
+    "create_deltas": _PROJECT_REPORTING_ROLES,
+    "read_deltas": _PROJECT_REPORTING_ROLES,
+    "create_delta": _PROJECT_EDITING_ROLES,
+    "create_delta_create_method": frozenset({ProjectCollaborator.Roles.REPORTER}),
+    "apply_pending_deltas": _PROJECT_MANAGEMENT_ROLES,
+    "set_delta_status": _PROJECT_MANAGEMENT_ROLES,
+    "read_jobs": _PROJECT_REPORTING_ROLES,
+    "create_secrets": _PROJECT_ADMIN_ROLES,
+    "delete_secrets": _PROJECT_ADMIN_ROLES,
+    "create_collaborators": _PROJECT_MANAGEMENT_ROLES,
+    "read_collaborators": _PROJECT_MANAGEMENT_ROLES,
+    "update_collaborators": _PROJECT_MANAGEMENT_ROLES,
+    "delete_collaborators": _PROJECT_MANAGEMENT_ROLES,
+    "read_packages": _ALL_PROJECT_ROLES,
+}
+
+ORGANIZATION_ADMIN_ROLES = (OrganizationMember.Roles.ADMIN,)
+ORGANIZATION_MEMBER_ROLES = (
+    OrganizationMember.Roles.MEMBER,
+    OrganizationMember.Roles.ADMIN,
+)
+ORGANIZATION_OWNER_ORIGINS = (OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER,)
+ORGANIZATION_MEMBERSHIP_ORIGINS = (
+    OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER,
+    OrganizationQueryset.RoleOrigins.ORGANIZATIONMEMBER,
+)
+
+# The delta statuses from which the status can be set manually, e.g. not while being applied.
+DELTA_STATUSES_ALLOWING_SET_STATUS = frozenset(
+    {
+        Delta.Status.PENDING,
+        Delta.Status.CONFLICT,
+        Delta.Status.NOT_APPLIED,
+        Delta.Status.ERROR,
+        Delta.Status.APPLIED,
+        Delta.Status.IGNORED,
+        Delta.Status.UNPERMITTED,
+    }
+)
+
 
 class CheckPermError(Exception):
     ...
@@ -58,42 +135,140 @@ def user_eq(user1: QfcUser, user2: QfcUser) -> bool:
 
 
 def _project_for_owner(user: QfcUser, project: Project, skip_invalid: bool):
-    return (
-        Project.objects.for_user(user, skip_invalid)
-        .select_related(None)
-        .filter(pk=project.pk)
+    return _projects_for_owner(user, [project], skip_invalid)
+
+
+def _projects_for_owner(user: QfcUser, projects: Iterable[Project], skip_invalid: bool):
+    return Project.objects.for_user(user, skip_invalid).filter(
+        pk__in=[project.pk for project in projects]
     )
 
 
 def _organization_of_owner(user: QfcUser, organization: Organization):
+    return Organization.objects.of_user(user).filter(pk=organization.pk)
+
+
+@contextmanager
+def permissions_cache() -> Generator[None, None, None]:
+    """Caches the user roles on projects and organizations looked up within the block.
+
+    Keep the block short lived (e.g. a single request), as role changes are not reflected in the cache.
+    """
+    token = _roles_cache.set({})
+    try:
+        yield
+    finally:
+        _roles_cache.reset(token)
+
+
+def _get_cached_role(
+    cache: dict[tuple, tuple[str, str] | None], key: tuple, queryset
+) -> tuple[str, str] | None:
+    """Returns the cached `(role, role_origin)` for `key`, evaluating `queryset` on cache miss."""
+    if key not in cache:
+        cache[key] = queryset.first()
+
+    return cache[key]
+
+
+def _get_cached_project_role(
+    cache: dict[tuple, tuple[str, str] | None],
+    user: QfcUser,
+    project: Project,
+    skip_invalid: bool,
+) -> tuple[str, str] | None:
+    return _get_cached_role(
+        cache,
+        ("project", user.pk, project.pk, skip_invalid),
+        _project_for_owner(user, project, skip_invalid).values_list(
+            "user_role", "user_role_origin"
+        ),
+    )
+
+
+def _get_cached_organization_role(
+    cache: dict[tuple, tuple[str, str] | None],
+    user: QfcUser,
+    organization: Organization,
+) -> tuple[str, str] | None:
+    return _get_cached_role(
+        cache,
+        ("organization", user.pk, organization.pk),
+        _organization_of_owner(user, organization).values_list(
+            "membership_role", "membership_role_origin"
+        ),
+    )
+
+
+def prefetch_user_project_roles(
+    user: QfcUser, projects: Iterable[Project], skip_invalid: bool = False
+) -> None:
+    """Fetches the user roles on multiple projects at once, so the following `user_has_project_roles` calls
+    on these projects do not hit the database. Does nothing outside of `permissions_cache()`.
+    """
+    cache = _roles_cache.get()
+
+    if cache is None:
+        return
+
+    projects = list(projects)
+    rows = _projects_for_owner(user, projects, skip_invalid).values_list(
+        "pk", "user_role", "user_role_origin"
+    )
+    project_roles = {pk: (role, role_origin) for pk, role, role_origin in rows}
+
+    for project in projects:
+        cache[("project", user.pk, project.pk, skip_invalid)] = project_roles.get(
+            project.pk
+        )
+
+
+def get_user_project_role(
+    user: QfcUser, project: Project, skip_invalid: bool = False
+) -> str | None:
+    """Returns the user role on the project, or `None` if the user has no role.
+
+    All role checks on a project are answered from this single lookup, cached within `permissions_cache()`.
+    """
+    cache = _roles_cache.get()
+
+    if cache is not None:
+        role = _get_cached_project_role(cache, user, project, skip_invalid)
+        return role[0] if role is not None else None
+
     return (
-        Organization.objects.of_user(user)
-        .select_related(None)
-        .filter(pk=organization.pk)
+        _project_for_owner(user, project, skip_invalid)
+        .values_list("user_role", flat=True)
+        .first()
     )
 
 
 def user_has_project_roles(
     user: QfcUser,
     project: Project,
-    roles: list[ProjectCollaborator.Roles],
+    roles: Collection[ProjectCollaborator.Roles],
     skip_invalid: bool = False,
 ):
+    return get_user_project_role(user, project, skip_invalid) in roles
+
+
+def user_can_project_action(
+    user: QfcUser,
+    project: Project,
+    action: str,
+    skip_invalid: bool = False,
+) -> bool:
+    """Returns whether the user has any of the project roles allowed for the action in `PROJECT_ACTION_ROLES`."""
     return (
-        _project_for_owner(user, project, skip_invalid)
-        .filter(user_role__in=roles)
-        .exists()
+        get_user_project_role(user, project, skip_invalid)
+        in PROJECT_ACTION_ROLES[action]
     )
 
 
 def check_user_has_project_role_origins(
-    user: QfcUser, project: Project, origins: list[ProjectQueryset.RoleOrigins]
+    user: QfcUser, project: Project, origins: Collection[ProjectQueryset.RoleOrigins]
 ) -> Literal[True]:
-    if (
-        _project_for_owner(user, project, skip_invalid=False)
-        .filter(user_role_origin__in=origins)
-        .exists()
-    ):
+    if user_has_project_role_origins(user, project, origins):
         return True
 
     raise UserHasProjectRoleOrigins(
@@ -106,22 +281,27 @@ def check_user_has_project_role_origins(
 
 
 def user_has_project_role_origins(
-    user: QfcUser, project: Project, origins: list[ProjectQueryset.RoleOrigins]
+    user: QfcUser, project: Project, origins: Collection[ProjectQueryset.RoleOrigins]
 ) -> bool:
-    try:
-        return check_user_has_project_role_origins(user, project, origins)
-    except CheckPermError:
-        return False
+    cache = _roles_cache.get()
+
+    if cache is not None:
+        role = _get_cached_project_role(cache, user, project, skip_invalid=False)
+        return role is not None and role[1] in origins
+
+    return (
+        _project_for_owner(user, project, skip_invalid=False)
+        .filter(user_role_origin__in=origins)
+        .exists()
+    )
 
 
 def check_user_has_organization_roles(
-    user: QfcUser, organization: Organization, roles: list[OrganizationMember.Roles]
+    user: QfcUser,
+    organization: Organization,
+    roles: Collection[OrganizationMember.Roles],
 ) -> Literal[True]:
-    if (
-        _organization_of_owner(user, organization)
-        .filter(membership_role__in=roles)
-        .exists()
-    ):
+    if user_has_organization_roles(user, organization, roles):
         return True
 
     raise UserOrganizationRoleError(
@@ -134,19 +314,34 @@ def check_user_has_organization_roles(
 
 
 def user_has_organization_roles(
-    user: QfcUser, organization: Organization, roles: list[OrganizationMember.Roles]
+    user: QfcUser,
+    organization: Organization,
+    roles: Collection[OrganizationMember.Roles],
 ) -> bool:
-    try:
-        return check_user_has_organization_roles(user, organization, roles)
-    except CheckPermError:
-        return False
+    cache = _roles_cache.get()
+
+    if cache is not None:
+        role = _get_cached_organization_role(cache, user, organization)
+        return role is not None and role[0] in roles
+
+    return (
+        _organization_of_owner(user, organization)
+        .filter(membership_role__in=roles)
+        .exists()
+    )
 
 
 def user_has_organization_role_origins(
     user: QfcUser,
     organization: Organization,
-    origins: list[OrganizationQueryset.RoleOrigins],
+    origins: Collection[OrganizationQueryset.RoleOrigins],
 ):
+    cache = _roles_cache.get()
+
+    if cache is not None:
+        role = _get_cached_organization_role(cache, user, organization)
+        return role is not None and role[1] in origins
+
     return (
         _organization_of_owner(user, organization)
         .filter(membership_role_origin__in=origins)
@@ -181,99 +376,37 @@ def can_create_project(
         # the user checks if they can create project of their own
         return user == organization
 
-    if user_has_organization_roles(
-        user, organization, [OrganizationMember.Roles.ADMIN]
-    ):
+    if user_has_organization_roles(user, organization, ORGANIZATION_ADMIN_ROLES):
         return True
 
     return False
 
 
 def can_access_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-            ProjectCollaborator.Roles.READER,
-        ],
-    )
+    return user_can_project_action(user, project, "access_project")
 
 
 def can_retrieve_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-            ProjectCollaborator.Roles.READER,
-        ],
-        True,
-    )
+    return user_can_project_action(user, project, "access_project", skip_invalid=True)
 
 
 def can_update_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "update_project")
 
 
 def can_delete_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "delete_project")
 
 
 def can_create_files(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-        ],
-    )
+    return user_can_project_action(user, project, "create_files")
 
 
 def can_modify_qgis_projectfile(user: QfcUser, project: Project) -> bool:
     if project.has_restricted_projectfiles:
-        return user_has_project_roles(
-            user,
-            project,
-            [
-                ProjectCollaborator.Roles.ADMIN,
-                ProjectCollaborator.Roles.MANAGER,
-            ],
-        )
+        return user_can_project_action(user, project, "modify_restricted_projectfile")
     else:
-        return user_has_project_roles(
-            user,
-            project,
-            [
-                ProjectCollaborator.Roles.ADMIN,
-                ProjectCollaborator.Roles.MANAGER,
-                ProjectCollaborator.Roles.EDITOR,
-                ProjectCollaborator.Roles.REPORTER,
-            ],
-        )
+        return user_can_project_action(user, project, "modify_projectfile")
 
 
 def can_read_projects(user: QfcUser, _account: QfcUser) -> bool:
@@ -285,103 +418,40 @@ def can_read_public_projects(user: QfcUser) -> bool:
 
 
 def can_read_files(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-            ProjectCollaborator.Roles.READER,
-        ],
-    )
+    return user_can_project_action(user, project, "read_files")
 
 
 def can_delete_files(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-        ],
-    )
+    return user_can_project_action(user, project, "delete_files")
 
 
 def can_delete_unnecessary_file_versions(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-        ],
-    )
+    return user_can_project_action(user, project, "delete_unnecessary_file_versions")
 
 
 def can_create_deltas(user: QfcUser, project: Project) -> bool:
     """Whether the user can store deltas in a project."""
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-        ],
-    )
+    return user_can_project_action(user, project, "create_deltas")
 
 
 def can_read_deltas(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-        ],
-    )
+    return user_can_project_action(user, project, "read_deltas")
 
 
 def can_apply_pending_deltas_for_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "apply_pending_deltas")
 
 
 def can_set_delta_status_for_project(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "set_delta_status")
 
 
 def can_set_delta_status(user: QfcUser, delta: Delta) -> bool:
-    if not can_set_delta_status_for_project(user, delta.project):
+    # NOTE check the already loaded status first, the role check might need a query
+    if delta.last_status not in DELTA_STATUSES_ALLOWING_SET_STATUS:
         return False
 
-    if delta.last_status not in (
-        Delta.Status.PENDING,
-        Delta.Status.CONFLICT,
-        Delta.Status.NOT_APPLIED,
-        Delta.Status.ERROR,
-        Delta.Status.APPLIED,
-        Delta.Status.IGNORED,
-        Delta.Status.UNPERMITTED,
-    ):
+    if not can_set_delta_status_for_project(user, delta.project):
         return False
 
     return True
@@ -390,19 +460,12 @@ def can_set_delta_status(user: QfcUser, delta: Delta) -> bool:
 def can_create_delta(user: QfcUser, delta: Delta) -> bool:
     """Whether the user can store given delta."""
     project: Project = delta.project
+    role = get_user_project_role(user, project)
 
-    if user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-        ],
-    ):
+    if role in PROJECT_ACTION_ROLES["create_delta"]:
         return True
 
-    if user_has_project_roles(user, project, [ProjectCollaborator.Roles.REPORTER]):
+    if role in PROJECT_ACTION_ROLES["create_delta_create_method"]:
         if delta.method == Delta.Method.Create:
             return True
 
@@ -410,36 +473,15 @@ def can_create_delta(user: QfcUser, delta: Delta) -> bool:
 
 
 def can_read_jobs(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-        ],
-    )
+    return user_can_project_action(user, project, "read_jobs")
 
 
 def can_create_secrets(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-        ],
-    )
+    return user_can_project_action(user, project, "create_secrets")
 
 
 def can_delete_secrets(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-        ],
-    )
+    return user_can_project_action(user, project, "delete_secrets")
 
 
 def can_list_users_organizations(user: QfcUser) -> bool:
@@ -457,7 +499,7 @@ def can_update_user(user: QfcUser, account: QfcUser) -> bool:
     if user_eq(user, account):
         return True
 
-    if user_has_organization_roles(user, account, [OrganizationMember.Roles.ADMIN]):
+    if user_has_organization_roles(user, account, ORGANIZATION_ADMIN_ROLES):
         return True
 
     return False
@@ -467,77 +509,37 @@ def can_delete_user(user: QfcUser, account: QfcUser) -> bool:
     if user_eq(user, account):
         return True
 
-    if user_has_organization_roles(user, account, [OrganizationMember.Roles.ADMIN]):
+    if user_has_organization_roles(user, account, ORGANIZATION_ADMIN_ROLES):
         return True
 
     return False
 
 
 def can_create_collaborators(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "create_collaborators")
 
 
 def can_read_collaborators(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "read_collaborators")
 
 
 def can_update_collaborators(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "update_collaborators")
 
 
 def can_delete_collaborators(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-        ],
-    )
+    return user_can_project_action(user, project, "delete_collaborators")
 
 
 def can_read_packages(user: QfcUser, project: Project) -> bool:
-    return user_has_project_roles(
-        user,
-        project,
-        [
-            ProjectCollaborator.Roles.ADMIN,
-            ProjectCollaborator.Roles.MANAGER,
-            ProjectCollaborator.Roles.EDITOR,
-            ProjectCollaborator.Roles.REPORTER,
-            ProjectCollaborator.Roles.READER,
-        ],
-    )
+    return user_can_project_action(user, project, "read_packages")
 
 
 def can_create_members(user: QfcUser, organization: Organization) -> bool:
     """Return True if the `user` can create members (incl. teams) of `organization`.
     Return False otherwise."""
 
-    return user_has_organization_roles(
-        user, organization, [OrganizationMember.Roles.ADMIN]
-    )
+    return user_has_organization_roles(user, organization, ORGANIZATION_ADMIN_ROLES)
 
 
 def can_read_members(user: QfcUser, organization: Organization) -> bool:
@@ -551,15 +553,11 @@ def can_read_members(user: QfcUser, organization: Organization) -> bool:
 
 
 def can_update_members(user: QfcUser, organization: Organization) -> bool:
-    return user_has_organization_roles(
-        user, organization, [OrganizationMember.Roles.ADMIN]
-    )
+    return user_has_organization_roles(user, organization, ORGANIZATION_ADMIN_ROLES)
 
 
 def can_delete_members(user: QfcUser, organization: Organization) -> bool:
-    return user_has_organization_roles(
-        user, organization, [OrganizationMember.Roles.ADMIN]
-    )
+    return user_has_organization_roles(user, organization, ORGANIZATION_ADMIN_ROLES)
 
 
 def check_can_become_collaborator(user: QfcUser, project: Project) -> bool:
@@ -577,7 +575,7 @@ def check_can_become_collaborator(user: QfcUser, project: Project) -> bool:
 
     max_premium_collaborators_per_private_project = project.owner.useraccount.current_subscription.plan.max_premium_collaborators_per_private_project
     if max_premium_collaborators_per_private_project >= 0 and not project.is_public:
-        project_collaborators_count = project.direct_collaborators.count()
+        project_collaborators_count = project.direct_collaborators_count
         if project_collaborators_count >= max_premium_collaborators_per_private_project:
             raise ReachedCollaboratorLimitError(
                 _(
@@ -589,13 +587,10 @@ def check_can_become_collaborator(user: QfcUser, project: Project) -> bool:
     # Rules for organization projects
     if project.owner.is_organization:
         if user.is_team:
-            if (
-                Team.objects.filter(
-                    pk=user.pk,
-                    team_organization=project.owner,
-                ).count()
-                != 1
-            ):
+            if not Team.objects.filter(
+                pk=user.pk,
+                team_organization=project.owner,
+            ).exists():
                 raise TeamOrganizationRoleError(
                     _(
                         'The team "{}" is not owned by the "{}" organization that owns the project.'
@@ -609,7 +604,7 @@ def check_can_become_collaborator(user: QfcUser, project: Project) -> bool:
             check_user_has_organization_roles(
                 user,
                 project.owner,
-                [OrganizationMember.Roles.MEMBER, OrganizationMember.Roles.ADMIN],
+                ORGANIZATION_MEMBER_ROLES,
             )
     else:
         if user.is_team:
@@ -684,10 +679,7 @@ def can_become_member(user: QfcUser, organization: Organization) -> bool:
     return not user_has_organization_role_origins(
         user,
         organization,
-        [
-            OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER,
-            OrganizationQueryset.RoleOrigins.ORGANIZATIONMEMBER,
-        ],
+        ORGANIZATION_MEMBERSHIP_ORIGINS,
     )
 
 
@@ -709,9 +701,7 @@ def can_read_billing(user: QfcUser, account: QfcUser) -> bool:
         return user_has_organization_role_origins(
             user,
             account,
-            [
-                OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER,
-            ],
+            ORGANIZATION_OWNER_ORIGINS,
         )
     else:
         return False
@@ -732,7 +722,7 @@ def can_change_additional_storage(user: QfcUser, subscription: Subscription) ->
         return user_has_organization_role_origins(
             user,
             subscription.account,
-            [OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER],
+            ORGANIZATION_OWNER_ORIGINS,
         )
 
     return False
@@ -758,7 +748,7 @@ def can_cancel_subscription_at_period_end(
     return user_has_organization_role_origins(
         user,
         subscription.account.user,
-        [OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER],
+        ORGANIZATION_OWNER_ORIGINS,
     )
 
 
@@ -779,7 +769,7 @@ def can_cancel_subscription_immediately(
     return user_has_organization_role_origins(
         user,
         subscription.account.user,
-        [OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER],
+        ORGANIZATION_OWNER_ORIGINS,
     )
 
 
@@ -798,7 +788,7 @@ def can_abort_subscription_cancellation(
     return user_has_organization_role_origins(
         user,
         subscription.account.user,
-        [OrganizationQueryset.RoleOrigins.ORGANIZATIONOWNER],
+        ORGANIZATION_OWNER_ORIGINS,
     )
 
 
@@ -139,7 +139,7 @@ class QfcTestCase(TestCase):
             out.strip(),
             "\n".join(
                 [
-                    "Invalid uuid: strangename/project.qgs",
+                    "Invalid uuid: strangename",
                     "Checking the last 2 project id(s) from the storage...",
                     "No project files to delete.",
                 ]
@@ -238,3 +238,24 @@ class QfcTestCase(APITestCase):
         subscription.plan.max_premium_collaborators_per_private_project = 0
         subscription.plan.save()
         assertBecomeCollaborator(u2, p1, None)
+
+    def test_prefetch_user_project_roles(self):
+        project2 = Project.objects.create(
+            name="project2", is_public=False, owner=self.user2
+        )
+        ProjectCollaborator.objects.create(
+            project=project2,
+            collaborator=self.user1,
+            role=ProjectCollaborator.Roles.READER,
+        )
+
+        with perms.permissions_cache():
+            with self.assertNumQueries(1):
+                perms.prefetch_user_project_roles(
+                    self.user1, [self.project1, project2]
+                )
+
+            with self.assertNumQueries(0):
+                self.assertTrue(perms.can_update_project(self.user1, self.project1))
+                self.assertTrue(perms.can_read_files(self.user1, project2))
+                self.assertFalse(perms.can_delete_files(self.user1, project2))
@@ -417,6 +417,59 @@ class QfcTestCase(APITransactionTestCase):
 
         self.assertEqual(len(p1.direct_collaborators), 0)
 
+    def test_direct_collaborators_count_annotation(self):
+        u1 = Person.objects.create(username="u1")
+        u2 = Person.objects.create(username="u2")
+        u3 = Person.objects.create(username="u3")
+        o1 = Organization.objects.create(username="o1", organization_owner=u1)
+        t1 = Team.objects.create(username="t1", team_organization=o1)
+        p1 = Project.objects.create(name="p1", owner=u1, is_public=False)
+        p2 = Project.objects.create(name="p2", owner=o1, is_public=False)
+        p3 = Project.objects.create(name="p3", owner=u1, is_public=False)
+
+        OrganizationMember.objects.create(organization=o1, member=u2)
+        OrganizationMember.objects.create(organization=o1, member=u3)
+
+        for project in (p1, p2):
+            ProjectCollaborator.objects.create(
+                project=project,
+                collaborator=u2,
+                role=ProjectCollaborator.Roles.READER,
+            )
+            ProjectCollaborator.objects.create(
+                project=project,
+                collaborator=u3,
+                role=ProjectCollaborator.Roles.READER,
+                is_incognito=True,
+            )
+            ProjectCollaborator.objects.create(
+                project=project,
+                collaborator=t1,
+                role=ProjectCollaborator.Roles.READER,
+            )
+
+        # the organization owner is not a direct collaborator of the organization's projects
+        ProjectCollaborator.objects.create(
+            project=p2,
+            collaborator=u1,
+            role=ProjectCollaborator.Roles.ADMIN,
+        )
+
+        projects = Project.objects.filter(
+            pk__in=[p1.pk, p2.pk, p3.pk]
+        ).with_direct_collaborators_count()
+
+        self.assertEqual(len(projects), 3)
+
+        for project in projects:
+            self.assertEqual(
+                project._direct_collaborators_count,
+                project.direct_collaborators.count(),
+            )
+
+        counts = {p.name: p._direct_collaborators_count for p in projects}
+        self.assertEqual(counts, {"p1": 1, "p2": 1, "p3": 0})
+
     def test_add_project_collaborator_and_being_org_member(self):
         u1 = Person.objects.create(username="u1")
         u2 = Person.objects.create(username="u2")
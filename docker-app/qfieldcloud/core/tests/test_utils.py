@@ -0,0 +1,39 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from qfieldcloud.core.utils import (
+    STRIP_JSON_NULL_BYTES_CHUNK_SIZE,
+    strip_json_null_bytes,
+)
+
+
+class QfcTestCase(SimpleTestCase):
+    def assertNullBytesStripped(self, data: bytes) -> None:
+        file = BytesIO(data)
+
+        result = strip_json_null_bytes(file)
+
+        self.assertEqual(result.read(), data.replace(rb"\u0000", b""))
+        self.assertEqual(file.tell(), 0)
+
+    def test_strip_json_null_bytes(self):
+        self.assertNullBytesStripped(b"")
+        self.assertNullBytesStripped(b"\\")
+        self.assertNullBytesStripped(b"\\u0000")
+        self.assertNullBytesStripped(b'{"name": "no null chars"}')
+        self.assertNullBytesStripped(b'{"name": "a\\u0000b\\u0000"}')
+        self.assertNullBytesStripped(b'{"name": "\\\\u0000"}')
+
+    def test_strip_json_null_bytes_across_chunks(self):
+        chunk_size = STRIP_JSON_NULL_BYTES_CHUNK_SIZE
+
+        # the escaped NULL char starts at every offset around the chunk boundary
+        for offset in range(1, 8):
+            with self.subTest(offset=offset):
+                data = b"a" * (chunk_size - offset) + b"\\u0000" + b"b" * 10
+                self.assertNullBytesStripped(data)
+
+        # a trailing lone backslash, at the end of a chunk and of the file
+        self.assertNullBytesStripped(b"a" * (chunk_size - 1) + b"\\")
+        self.assertNullBytesStripped(b"a" * (chunk_size - 1) + b"\\" + b"u000")
+        self.assertNullBytesStripped(b'{"name": "a\\')
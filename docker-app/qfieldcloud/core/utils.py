@@ -4,7 +4,10 @@ import json
 import logging
 import os
 import posixpath
+import threading
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import PurePath
 from typing import IO, Generator, NamedTuple
 
@@ -17,6 +20,9 @@ from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUpload
 
 logger = logging.getLogger(__name__)
 
+# The size of the chunks `strip_json_null_bytes` reads the file in
+STRIP_JSON_NULL_BYTES_CHUNK_SIZE = 65536
+
 
 class S3PrefixPath(NamedTuple):
     Key: str
@@ -84,6 +90,9 @@ class S3ObjectWithVersions(NamedTuple):
         return sum(v.size for v in self.versions if v.size is not None)
 
 
+_s3_thread_local = threading.local()
+
+
 def get_s3_session() -> boto3.Session:
     """Get a new S3 Session instance using Django settings"""
 
@@ -97,9 +106,20 @@ def get_s3_session() -> boto3.Session:
 
 def get_s3_bucket() -> mypy_boto3_s3.service_resource.Bucket:
     """
-    Get a new S3 Bucket instance using Django settings.
+    Get the S3 Bucket instance of the current thread using Django settings.
+
+    NOTE boto3 resources are not thread safe, therefore the bucket is cached per thread.
     """
+    bucket = getattr(_s3_thread_local, "bucket", None)
+
+    if bucket is None:
+        bucket = _create_s3_bucket()
+        _s3_thread_local.bucket = bucket
+
+    return bucket
+
 
+def _create_s3_bucket() -> mypy_boto3_s3.service_resource.Bucket:
     bucket_name = settings.STORAGE_BUCKET_NAME
 
     assert bucket_name, "Expected `bucket_name` to be non-empty string!"
@@ -107,15 +127,22 @@ def get_s3_bucket() -> mypy_boto3_s3.service_resource.Bucket:
     session = get_s3_session()
     s3 = session.resource("s3", endpoint_url=settings.STORAGE_ENDPOINT_URL)
 
-    # Ensure the bucket exists
-    s3.meta.client.head_bucket(Bucket=bucket_name)
-
     # Get the bucket resource
     return s3.Bucket(bucket_name)
 
 
+def check_s3_bucket() -> None:
+    """Ensure the S3 bucket exists and is reachable, raises a botocore exception otherwise.
+
+    NOTE the bucket returned by `get_s3_bucket` is cached, so the check is done on every call here.
+    An empty `STORAGE_BUCKET_NAME` is reported as a botocore `ParamValidationError` too.
+    """
+    get_s3_client().head_bucket(Bucket=settings.STORAGE_BUCKET_NAME)
+
+
+@lru_cache
 def get_s3_client() -> mypy_boto3_s3.Client:
-    """Get a new S3 client instance using Django settings"""
+    """Get the S3 client instance using Django settings, shared as boto3 clients are thread safe"""
 
     s3_session = get_s3_session()
     s3_client = s3_session.client(
@@ -127,75 +154,92 @@ def get_s3_client() -> mypy_boto3_s3.Client:
 
 def get_sha256(file: IO) -> str:
     """Return the sha256 hash of the file"""
-    if type(file) is InMemoryUploadedFile or type(file) is TemporaryUploadedFile:
-        return _get_sha256_memory_file(file)
-    else:
-        return _get_sha256_file(file)
+    return _get_file_digest(file, "sha256")
 
 
-def _get_sha256_memory_file(file: InMemoryUploadedFile | TemporaryUploadedFile) -> str:
-    BLOCKSIZE = 65536
-    hasher = hashlib.sha256()
+def get_md5sum(file: IO) -> str:
+    """Return the md5sum hash of the file"""
+    return _get_file_digest(file, "md5")
 
-    for chunk in file.chunks(BLOCKSIZE):
-        hasher.update(chunk)
 
-    file.seek(0)
-    return hasher.hexdigest()
+def get_sha256_and_md5sum(file: IO) -> tuple[str, str]:
+    """Return the sha256 and md5sum hashes of the file, reading it only once"""
+    sha256sum, md5sum = _get_file_digests(file, ("sha256", "md5"))
+    return sha256sum, md5sum
 
 
-def _get_sha256_file(file: IO) -> str:
-    BLOCKSIZE = 65536
-    hasher = hashlib.sha256()
-    buf = file.read(BLOCKSIZE)
-    while len(buf) > 0:
-        hasher.update(buf)
-        buf = file.read(BLOCKSIZE)
-    file.seek(0)
-    return hasher.hexdigest()
+def _get_file_digests(file: IO, algorithms: tuple[str, ...]) -> list[str]:
+    """Return the hex digests of the file for each of the given hashlib algorithms, reading it once, and rewind the file."""
+    # NOTE uploaded files are always hashed from the start, as their `chunks()` did
+    if isinstance(file, (InMemoryUploadedFile, TemporaryUploadedFile)):
+        file.seek(0)
 
+    # NOTE the hashes are used for integrity checks only. Passing `usedforsecurity=False` keeps
+    # the OpenSSL implementation usable on FIPS enabled systems, where md5 is otherwise rejected.
+    def new_hasher(algorithm: str):
+        return hashlib.new(algorithm, usedforsecurity=False)
 
-def get_md5sum(file: IO) -> str:
-    """Return the md5sum hash of the file"""
-    if type(file) is InMemoryUploadedFile or type(file) is TemporaryUploadedFile:
-        return _get_md5sum_memory_file(file)
+    # NOTE `hashlib.file_digest` is available since Python 3.11 and hashes the file in C, but only with a single algorithm
+    if (
+        len(algorithms) == 1
+        and hasattr(hashlib, "file_digest")
+        and hasattr(file, "readinto")
+    ):
+        hashers = [hashlib.file_digest(file, lambda: new_hasher(algorithms[0]))]
     else:
-        return _get_md5sum_file(file)
+        BLOCKSIZE = 65536
+        hashers = [new_hasher(algorithm) for algorithm in algorithms]
+        buf = file.read(BLOCKSIZE)
+        while len(buf) > 0:
+            for hasher in hashers:
+                hasher.update(buf)
+            buf = file.read(BLOCKSIZE)
 
+    file.seek(0)
+    return [hasher.hexdigest() for hasher in hashers]
 
-def _get_md5sum_memory_file(file: InMemoryUploadedFile | TemporaryUploadedFile) -> str:
-    BLOCKSIZE = 65536
-    hasher = hashlib.md5()
 
-    for chunk in file.chunks(BLOCKSIZE):
-        hasher.update(chunk)
+def _get_file_digest(file: IO, algorithm: str) -> str:
+    """Return the hex digest of the file using the given hashlib algorithm and rewind the file."""
+    return _get_file_digests(file, (algorithm,))[0]
 
-    file.seek(0)
-    return hasher.hexdigest()
 
+def strip_json_null_bytes(file: IO) -> IO:
+    """Return JSON string stream without NULL chars.
 
-def _get_md5sum_file(file: IO) -> str:
-    BLOCKSIZE = 65536
-    hasher = hashlib.md5()
+    The file is processed in chunks and directly as bytes, as the escaped NULL char is pure ASCII.
+    """
+    null_char = rb"\u0000"
+    result = io.BytesIO()
+    tail = b""
 
-    buf = file.read(BLOCKSIZE)
-    while len(buf) > 0:
-        hasher.update(buf)
-        buf = file.read(BLOCKSIZE)
-    file.seek(0)
-    return hasher.hexdigest()
+    while chunk := file.read(STRIP_JSON_NULL_BYTES_CHUNK_SIZE):
+        buf = tail + chunk
+        # a NULL char split between two chunks can only start with a backslash in the last few bytes,
+        # keep the buffer from there for the next iteration
+        cut = buf.find(b"\\", max(len(buf) - len(null_char) + 1, 0))
+        if cut == -1:
+            cut = len(buf)
 
+        result.write(buf[:cut].replace(null_char, b""))
+        tail = buf[cut:]
 
-def strip_json_null_bytes(file: IO) -> IO:
-    """Return JSON string stream without NULL chars."""
-    result = io.BytesIO()
-    result.write(file.read().decode().replace(r"\u0000", "").encode())
+    result.write(tail.replace(null_char, b""))
     file.seek(0)
     result.seek(0)
 
     return result
 
 
+def _is_normalized_relpath(path: str) -> bool:
+    """Returns whether the path has no empty, `.` or `..` segments, ignoring a single trailing `/`."""
+    segments = path.split("/")
+    if segments[-1] == "":
+        segments.pop()
+
+    return all(segment not in ("", ".", "..") for segment in segments)
+
+
 def safe_join(base: str, *paths: str) -> str:
     """
     A version of django.utils._os.safe_join for S3 paths.
@@ -210,6 +254,23 @@ def safe_join(base: str, *paths: str) -> str:
     base_path = base_path.rstrip("/")
     paths = tuple(paths)
 
+    # NOTE fast path for the common case of already normalized relative components,
+    # where normalizing each component would only return the concatenated path.
+    if _is_normalized_relpath(base_path) and all(
+        not path.startswith("/") and _is_normalized_relpath(path) for path in paths
+    ):
+        final_path = base_path + "/"
+        for path in paths:
+            if not path:
+                continue
+
+            if not final_path.endswith("/"):
+                final_path += "/"
+
+            final_path += path
+
+        return final_path.lstrip("/")
+
     final_path = base_path + "/"
     for path in paths:
         _final_path = posixpath.normpath(posixpath.join(final_path, path))
@@ -249,10 +310,16 @@ def get_qgis_project_file(project_id: str) -> str | None:
 
     prefix = f"projects/{project_id}/files/"
 
+    # NOTE the project file is usually at the top level, look there first without listing the files in subdirectories
+    paginator = bucket.meta.client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket.name, Prefix=prefix, Delimiter="/"):
+        for obj in page.get("Contents", []):
+            if is_qgis_project_file(obj["Key"]):
+                return obj["Key"][len(prefix) :]
+
     for obj in bucket.objects.filter(Prefix=prefix):
         if is_qgis_project_file(obj.key):
-            path = PurePath(obj.key)
-            return str(path.relative_to(*path.parts[:3]))
+            return obj.key[len(prefix) :]
 
     return None
 
@@ -277,9 +344,10 @@ def check_s3_key(key: str) -> str | None:
         return metadata["Sha256sum"]
 
 
+@lru_cache
 def get_deltafile_schema_validator() -> jsonschema.Draft7Validator:
     """Creates a JSON schema validator to check whether the provided delta
-    file is valid.
+    file is valid. The validator is created once and reused on next calls.
 
     Returns:
         jsonschema.Draft7Validator -- JSON Schema validator
@@ -372,18 +440,16 @@ def get_project_files_count(project_id: str) -> int:
     """Returns the number of files within a project."""
     bucket = get_s3_bucket()
     prefix = f"projects/{project_id}/files/"
-    files = list(bucket.objects.filter(Prefix=prefix))
 
-    return len(files)
+    return count_objects(bucket, prefix)
 
 
 def get_project_package_files_count(project_id: str) -> int:
     """Returns the number of package files within a project."""
     bucket = get_s3_bucket()
     prefix = f"projects/{project_id}/export/"
-    files = list(bucket.objects.filter(Prefix=prefix))
 
-    return len(files)
+    return count_objects(bucket, prefix)
 
 
 def list_files(
@@ -392,17 +458,12 @@ def list_files(
     strip_prefix: str = "",
 ) -> list[S3Object]:
     """List a bucket's objects under prefix."""
+    start_idx = len(strip_prefix)
     files = []
     for f in bucket.objects.filter(Prefix=prefix):
-        if strip_prefix:
-            start_idx = len(strip_prefix)
-            name = f.key[start_idx:]
-        else:
-            name = f.key
-
         files.append(
             S3Object(
-                name=name,
+                name=f.key[start_idx:],
                 key=f.key,
                 last_modified=f.last_modified,
                 size=f.size,
@@ -411,26 +472,52 @@ def list_files(
             )
         )
 
-    files.sort(key=lambda f: f.name)
+    files.sort(key=attrgetter("name"))
 
     return files
 
 
+def count_objects(
+    bucket: mypy_boto3_s3.service_resource.Bucket,
+    prefix: str,
+) -> int:
+    """Returns the number of a bucket's objects under prefix, without creating an object resource per key."""
+    paginator = bucket.meta.client.get_paginator("list_objects_v2")
+
+    return sum(
+        page["KeyCount"]
+        for page in paginator.paginate(Bucket=bucket.name, Prefix=prefix)
+    )
+
+
+def list_prefixes(
+    bucket: mypy_boto3_s3.service_resource.Bucket,
+    prefix: str,
+    strip_prefix: str = "",
+) -> Generator[str, None, None]:
+    """Yields the distinct "directories" directly under prefix, without listing every object in them."""
+    paginator = bucket.meta.client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(Bucket=bucket.name, Prefix=prefix, Delimiter="/"):
+        for common_prefix in page.get("CommonPrefixes", []):
+            name = common_prefix["Prefix"]
+
+            if strip_prefix:
+                name = name[len(strip_prefix) :]
+
+            yield name
+
+
 def list_versions(
     bucket: mypy_boto3_s3.service_resource.Bucket,
     prefix: str,
     strip_prefix: str = "",
 ) -> list[S3ObjectVersion]:
     """Iterator that lists a bucket's objects under prefix."""
+    start_idx = len(prefix) if strip_prefix else 0
     versions = []
     for v in bucket.object_versions.filter(Prefix=prefix):
-        if strip_prefix:
-            start_idx = len(prefix)
-            name = v.key[start_idx:]
-        else:
-            name = v.key
-
-        versions.append(S3ObjectVersion(name, v))
+        versions.append(S3ObjectVersion(v.key[start_idx:], v))
 
     versions.sort(key=lambda v: (v.key, v.last_modified))
 
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+import heapq
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from pathlib import PurePath
-from typing import IO
+from typing import IO, Iterable
 
 import qfieldcloud.core.models
 import qfieldcloud.core.utils
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.db import transaction
 from django.http import FileResponse, HttpRequest
 from django.http.response import HttpResponse, HttpResponseBase
@@ -18,6 +18,29 @@ from qfieldcloud.core.utils2.audit import LogEntry, audit
 
 logger = logging.getLogger(__name__)
 
+# The maximum number of objects S3 accepts in a single `DeleteObjects` request
+DELETE_OBJECTS_BATCH_SIZE = 1000
+# The maximum number of concurrent `DeleteObjects` requests
+DELETE_OBJECTS_MAX_WORKERS = 8
+# The size of the chunks of S3 objects streamed by `file_response`
+FILE_RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# The expected formats of the S3 keys and prefixes, checked before deleting anything
+USER_AVATAR_KEY_REGEX = re.compile(r"^users/[\w-]+/avatar\.(png|jpg|svg)$")
+PROJECT_THUMBNAIL_KEY_REGEX = re.compile(
+    # e.g. "projects/9bf34e75-0a5d-47c3-a2f0-ebb7126eeccc/meta/thumbnail.png"
+    r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/meta/thumbnail\.(png|jpg|svg)$"
+)
+PROJECT_PREFIX_REGEX = re.compile(r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/$")
+PROJECT_FILE_KEY_REGEX = re.compile(r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/.+$")
+PROJECT_FILES_PREFIX_REGEX = re.compile(
+    r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/files/$"
+)
+PROJECT_PACKAGE_PREFIX_REGEX = re.compile(
+    # e.g. "projects/878039c4-b945-4356-a44e-a908fd3f2263/packages/633cd4f7-db14-4e6e-9b2b-c0ce98f9d338/"
+    r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/packages/[\w]{8}(-[\w]{4}){3}-[\w]{12}/$"
+)
+
 
 def _delete_by_prefix_versioned(prefix: str):
     """
@@ -66,7 +89,17 @@ def _delete_by_prefix_permanently(prefix: str):
         raise RuntimeError(f"Attempt to delete S3 object with illegal {prefix=}")
 
     bucket = qfieldcloud.core.utils.get_s3_bucket()
-    return bucket.object_versions.filter(Prefix=prefix).delete()
+    paginator = bucket.meta.client.get_paginator("list_object_versions")
+
+    def list_versions() -> Iterable[ObjectIdentifierTypeDef]:
+        for page in paginator.paginate(Bucket=bucket.name, Prefix=prefix):
+            for version in [*page.get("Versions", []), *page.get("DeleteMarkers", [])]:
+                yield {
+                    "Key": version["Key"],
+                    "VersionId": version["VersionId"],
+                }
+
+    _delete_versions_permanently(list_versions())
 
 
 def _delete_by_key_versioned(key: str):
@@ -99,6 +132,7 @@ def _delete_by_key_versioned(key: str):
                     "Key": key,
                 }
             ],
+            "Quiet": True,
         },
     )
 
@@ -125,32 +159,35 @@ def _delete_by_key_permanently(key: str):
         )
 
     bucket = qfieldcloud.core.utils.get_s3_bucket()
+    paginator = bucket.meta.client.get_paginator("list_object_versions")
 
     # NOTE filer by prefix will return all objects with that prefix. E.g. for given key="orho.tif", it will return "ortho.tif", "ortho.tif.aux.xml" and "ortho.tif.backup"
-    temp_objects = bucket.object_versions.filter(
-        Prefix=key,
-    )
     object_to_delete: list[ObjectIdentifierTypeDef] = []
-    for temp_object in temp_objects:
-        # filter out objects that do not have the same key as the requested deletion key.
-        if temp_object.key != key:
-            continue
+    other_keys: set[str] = set()
+    for page in paginator.paginate(Bucket=bucket.name, Prefix=key):
+        for version in [*page.get("Versions", []), *page.get("DeleteMarkers", [])]:
+            # filter out objects that do not have the same key as the requested deletion key.
+            if version["Key"] != key:
+                other_keys.add(version["Key"])
+                continue
 
-        object_to_delete.append(
-            {
-                "Key": key,
-                "VersionId": temp_object.id,
-            }
-        )
+            object_to_delete.append(
+                {
+                    "Key": key,
+                    "VersionId": version["VersionId"],
+                }
+            )
+
+        # NOTE versions are listed ordered by key and the exact key sorts before all other keys with
+        # the same prefix, so no more versions of the key will follow once other keys appear.
+        if other_keys:
+            break
 
     if len(object_to_delete) == 0:
         logging.warning(
             f"Attempt to delete (permanently) S3 objects did not match any existing objects for {key=}",
             extra={
-                "all_objects": [
-                    (o.key, o.version_id, o.e_tag, o.last_modified, o.is_latest)
-                    for o in temp_objects
-                ]
+                "all_objects": sorted(other_keys),
             },
         )
         return None
@@ -159,38 +196,64 @@ def _delete_by_key_permanently(key: str):
         f"Delete (permanently) S3 object with {key=} will delete delete {len(object_to_delete)} version(s)"
     )
 
-    return bucket.delete_objects(
-        Delete={
-            "Objects": object_to_delete,
-        },
-    )
+    _delete_versions_permanently(object_to_delete)
 
 
-def delete_version_permanently(version_obj: qfieldcloud.core.utils.S3ObjectVersion):
-    logging.info(
-        f'S3 object version deletion (permanent) with "{version_obj.key=}" and "{version_obj.id=}"'
-    )
+def _delete_versions_permanently(
+    objects: Iterable[ObjectIdentifierTypeDef],
+) -> None:
+    """Permanently deletes the given object versions in batched `DeleteObjects` requests, sent concurrently.
 
-    version_obj._data.delete()
+    Args:
+        objects (Iterable[ObjectIdentifierTypeDef]): the `Key` and `VersionId` of the object versions to delete
 
+    Raises:
+        RuntimeError: When S3 fails to delete any of the object versions.
+    """
+    bucket_name = qfieldcloud.core.utils.get_s3_bucket().name
+    client = qfieldcloud.core.utils.get_s3_client()
 
-def get_attachment_dir_prefix(
-    project: qfieldcloud.core.models.Project, filename: str
-) -> str:  # noqa: F821
-    """Returns the attachment dir where the file belongs to or empty string if it does not.
+    def delete_batch(batch: list[ObjectIdentifierTypeDef]) -> None:
+        logging.info(
+            f"S3 object versions deletion (permanent) of {len(batch)} versions"
+        )
 
-    Args:
-        project (Project): project to check
-        filename (str): filename to check
+        response = client.delete_objects(
+            Bucket=bucket_name,
+            Delete={
+                "Objects": batch,
+                "Quiet": True,
+            },
+        )
 
-    Returns:
-        str: the attachment dir or empty string if no match found
-    """
-    for attachment_dir in project.attachment_dirs:
-        if filename.startswith(attachment_dir):
-            return attachment_dir
+        # NOTE in quiet mode only the failed deletions are returned
+        if response.get("Errors"):
+            raise RuntimeError(
+                f"Failed to delete S3 object versions: {response['Errors']}"
+            )
+
+    with ThreadPoolExecutor(max_workers=DELETE_OBJECTS_MAX_WORKERS) as executor:
+        futures = []
+        batch: list[ObjectIdentifierTypeDef] = []
 
-    return ""
+        for obj in objects:
+            batch.append(obj)
+
+            if len(batch) == DELETE_OBJECTS_BATCH_SIZE:
+                futures.append(executor.submit(delete_batch, batch))
+                batch = []
+
+        if batch:
+            futures.append(executor.submit(delete_batch, batch))
+
+        # re-raise the first failure, if any
+        for future in futures:
+            future.result()
+
+
+def is_attachment_file(project: qfieldcloud.core.models.Project, filename: str) -> bool:
+    """Returns whether the file belongs to any of the project attachment dirs."""
+    return filename.startswith(tuple(project.attachment_dirs))
 
 
 def file_response(
@@ -201,7 +264,7 @@ def file_response(
     as_attachment: bool = False,
 ) -> HttpResponseBase:
     url = ""
-    filename = PurePath(key).name
+    filename = key.rsplit("/", 1)[-1]
     extra_params = {}
 
     if version is not None:
@@ -236,19 +299,30 @@ def file_response(
 
         return response
     elif settings.DEBUG or settings.IN_TEST_SUITE:
-        return_file = ContentFile(b"")
-        qfieldcloud.core.utils.get_s3_bucket().download_fileobj(
-            key,
-            return_file,
-            extra_params,
-        )
+        client = qfieldcloud.core.utils.get_s3_client()
+        bucket_name = qfieldcloud.core.utils.get_s3_bucket().name
+
+        if version is not None:
+            s3_object = client.get_object(
+                Bucket=bucket_name,
+                Key=key,
+                VersionId=version,
+            )
+        else:
+            s3_object = client.get_object(Bucket=bucket_name, Key=key)
 
-        return FileResponse(
-            return_file.open(),
+        # NOTE stream the file contents in chunks instead of loading the whole file in memory.
+        # The body must be passed as a file-like object, otherwise `FileResponse` skips setting the `Content-Disposition` header.
+        streamed_response = FileResponse(
+            s3_object["Body"],
             as_attachment=as_attachment,
             filename=filename,
             content_type="text/html",
         )
+        streamed_response.block_size = FILE_RESPONSE_CHUNK_SIZE
+        streamed_response["Content-Length"] = s3_object["ContentLength"]
+
+        return streamed_response
 
     raise Exception(
         "Expected to either run behind nginx proxy, debug mode or within a test suite."
@@ -310,7 +384,7 @@ def delete_user_avatar(user: qfieldcloud.core.models.User) -> None:  # noqa: F82
         return
 
     # e.g. "users/suricactus/avatar.svg"
-    if not key or not re.match(r"^users/[\w-]+/avatar\.(png|jpg|svg)$", key):
+    if not key or not USER_AVATAR_KEY_REGEX.match(key):
         raise RuntimeError(f"Suspicious S3 deletion of user avatar {key=}")
 
     _delete_by_key_permanently(key)
@@ -372,11 +446,7 @@ def delete_project_thumbnail(
     if not key:
         return
 
-    if not key or not re.match(
-        # e.g. "projects/9bf34e75-0a5d-47c3-a2f0-ebb7126eeccc/meta/thumbnail.png"
-        r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/meta/thumbnail\.(png|jpg|svg)$",
-        key,
-    ):
+    if not key or not PROJECT_THUMBNAIL_KEY_REGEX.match(key):
         raise RuntimeError(f"Suspicious S3 deletion of project thumbnail image {key=}")
 
     _delete_by_key_permanently(key)
@@ -395,12 +465,18 @@ def purge_old_file_versions(
 
     logger.info(f"Cleaning up old files for {project} to {keep_count} versions")
 
+    versions_to_delete: list[ObjectIdentifierTypeDef] = []
+
     # Process file by file
     for file in qfieldcloud.core.utils.get_project_files_with_versions(project.pk):
-        # Skip the newest N
-        old_versions_to_purge = sorted(
-            file.versions, key=lambda v: v.last_modified, reverse=True
-        )[keep_count:]
+        purge_count = len(file.versions) - keep_count
+        if purge_count <= 0:
+            continue
+
+        # Skip the newest N, on equal modification time the latest version is considered newer
+        old_versions_to_purge = heapq.nsmallest(
+            purge_count, file.versions, key=lambda v: (v.last_modified, v.is_latest)
+        )
 
         # Debug print
         logger.debug(
@@ -415,16 +491,25 @@ def purge_old_file_versions(
                 # ordering changes for some reason.
                 raise Exception("Trying to delete latest version")
 
-            if not old_version.key or not re.match(
-                r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/.+$", old_version.key
-            ):
+            if not old_version.key or not PROJECT_FILE_KEY_REGEX.match(old_version.key):
                 raise RuntimeError(
                     f"Suspicious S3 file version deletion {old_version.key=} {old_version.id=}"
                 )
-            # TODO: any way to batch those ? will probaby get slow on production
-            delete_version_permanently(old_version)
+
+            versions_to_delete.append(
+                {
+                    "Key": old_version.key,
+                    "VersionId": old_version.id,
+                }
+            )
             # TODO: audit ? take implementation from files_views.py:211
 
+    # Nothing to purge, the project size did not change
+    if not versions_to_delete:
+        return
+
+    _delete_versions_permanently(versions_to_delete)
+
     # Update the project size
     project.save(recompute_storage=True)
 
@@ -453,7 +538,7 @@ def upload_project_file(
 def delete_all_project_files_permanently(project_id: str) -> None:
     prefix = f"projects/{project_id}/"
 
-    if not re.match(r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/$", prefix):
+    if not PROJECT_PREFIX_REGEX.match(prefix):
         raise RuntimeError(
             f"Suspicious S3 deletion of all project files with {prefix=}"
         )
@@ -473,7 +558,7 @@ def delete_project_file_permanently(
             f"No file with such name in the given project found {filename=}"
         )
 
-    if not re.match(r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/.+$", file.latest.key):
+    if not PROJECT_FILE_KEY_REGEX.match(file.latest.key):
         raise RuntimeError(f"Suspicious S3 file deletion {file.latest.key=}")
 
     # NOTE the file operations depend on HTTP calls to the S3 storage and they might fail,
@@ -541,35 +626,27 @@ def delete_project_file_version_permanently(
                 "Forbidded attempt to delete a specific file version which is the only file version available."
             )
 
-    versions_latest_first = list(reversed(file.versions))
-    versions_to_delete: list[qfieldcloud.core.utils.S3ObjectVersion] = []
-
-    for file_version in versions_latest_first:
-        if file_version.id == version_id:
-            versions_to_delete.append(file_version)
-
-            if include_older:
-                continue
-            else:
-                break
-
-        if versions_to_delete:
-            assert (
-                include_older
-            ), "We should continue to loop only if `include_older` is True"
-            assert (
-                versions_to_delete[-1].last_modified > file_version.last_modified
-            ), "Assert the other versions are really older than the requested one"
+    # NOTE `file.versions` are ordered from the oldest to the latest
+    version_idx = next(
+        (idx for idx, v in enumerate(file.versions) if v.id == version_id),
+        None,
+    )
 
-            versions_to_delete.append(file_version)
+    versions_to_delete: list[qfieldcloud.core.utils.S3ObjectVersion]
+    if version_idx is None:
+        versions_to_delete = []
+    elif include_older:
+        # the requested version and all older versions, latest first
+        versions_to_delete = file.versions[version_idx::-1]
+    else:
+        versions_to_delete = [file.versions[version_idx]]
 
     with transaction.atomic():
+        changes = {}
+
         for file_version in versions_to_delete:
             if (
-                not re.match(
-                    r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/.+$",
-                    file_version._data.key,
-                )
+                not PROJECT_FILE_KEY_REGEX.match(file_version._data.key)
                 or not file_version.id
             ):
                 raise RuntimeError(
@@ -577,14 +654,22 @@ def delete_project_file_version_permanently(
                 )
 
             audit_suffix = file_version.display
+            changes[f"{filename} {audit_suffix}"] = [file_version.e_tag, None]
 
+        if changes:
             audit(
                 project,
                 LogEntry.Action.DELETE,
-                changes={f"{filename} {audit_suffix}": [file_version.e_tag, None]},
+                changes=changes,
             )
 
-            delete_version_permanently(file_version)
+        _delete_versions_permanently(
+            {
+                "Key": file_version.key,
+                "VersionId": file_version.id,
+            }
+            for file_version in versions_to_delete
+        )
 
     project.save(recompute_storage=True)
 
@@ -594,25 +679,17 @@ def delete_project_file_version_permanently(
 def get_stored_package_ids(project_id: str) -> set[str]:
     bucket = qfieldcloud.core.utils.get_s3_bucket()
     prefix = f"projects/{project_id}/packages/"
-    root_path = PurePath(prefix)
-    package_ids = set()
 
-    for file in bucket.objects.filter(Prefix=prefix):
-        file_path = PurePath(file.key)
-        parts = file_path.relative_to(root_path).parts
-        package_ids.add(parts[0])
-
-    return package_ids
+    return {
+        package_dir.rstrip("/")
+        for package_dir in qfieldcloud.core.utils.list_prefixes(bucket, prefix, prefix)
+    }
 
 
 def delete_stored_package(project_id: str, package_id: str) -> None:
     prefix = f"projects/{project_id}/packages/{package_id}/"
 
-    if not re.match(
-        # e.g. "projects/878039c4-b945-4356-a44e-a908fd3f2263/packages/633cd4f7-db14-4e6e-9b2b-c0ce98f9d338/"
-        r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/packages/[\w]{8}(-[\w]{4}){3}-[\w]{12}/$",
-        prefix,
-    ):
+    if not PROJECT_PACKAGE_PREFIX_REGEX.match(prefix):
         raise RuntimeError(
             f"Suspicious S3 deletion on stored project package {project_id=} {package_id=}"
         )
@@ -631,12 +708,17 @@ def get_project_file_storage_in_bytes(project_id: str) -> int:
 
     logger.info(f"Project file storage size requested for {project_id=}")
 
-    if not re.match(r"^projects/[\w]{8}(-[\w]{4}){3}-[\w]{12}/files/$", prefix):
+    if not PROJECT_FILES_PREFIX_REGEX.match(prefix):
         raise RuntimeError(
             f"Suspicious S3 calculation of all project files with {prefix=}"
         )
 
-    for version in bucket.object_versions.filter(Prefix=prefix):
-        total_bytes += version.size or 0
+    # NOTE use the raw listing, building a boto3 resource per version is slow on large projects
+    paginator = bucket.meta.client.get_paginator("list_object_versions")
+    for page in paginator.paginate(Bucket=bucket.name, Prefix=prefix):
+        # NOTE delete markers have no size, so they are not part of `Versions`
+        total_bytes += sum(
+            version.get("Size", 0) for version in page.get("Versions", [])
+        )
 
     return total_bytes
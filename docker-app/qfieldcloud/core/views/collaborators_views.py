@@ -39,20 +39,22 @@ class ListCreateCollaboratorsView(generics.ListCreateAPIView):
         ListCreateCollaboratorsViewPermissions,
     ]
     serializer_class = ProjectCollaboratorSerializer
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
         project_id = self.request.parser_context["kwargs"]["projectid"]
-        project_obj = Project.objects.get(id=project_id)
 
-        return ProjectCollaborator.objects.filter(project=project_obj)
+        # NOTE the project has already been fetched and checked by the permission class
+        return ProjectCollaborator.objects.filter(project_id=project_id).select_related(
+            "collaborator"
+        )
 
     def post(self, request, projectid):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         collaborator = User.objects.get(username=request.data["collaborator"])
-        project = Project.objects.get(id=projectid)
-        serializer.save(collaborator=collaborator, project=project)
+        # NOTE the project has already been fetched and checked by the permission class
+        serializer.save(collaborator=collaborator, project_id=projectid)
 
         try:
             headers = {"Location": str(serializer.data[api_settings.URL_FIELD_NAME])}
@@ -100,8 +102,6 @@ class GetUpdateDestroyCollaboratorView(generics.RetrieveUpdateDestroyAPIView):
         project_id = self.request.parser_context["kwargs"]["projectid"]
         collaborator = self.request.parser_context["kwargs"]["username"]
 
-        project_obj = Project.objects.get(id=project_id)
-        collaborator_obj = User.objects.get(username=collaborator)
-        return ProjectCollaborator.objects.get(
-            project=project_obj, collaborator=collaborator_obj
+        return ProjectCollaborator.objects.select_related("collaborator").get(
+            project_id=project_id, collaborator__username=collaborator
         )
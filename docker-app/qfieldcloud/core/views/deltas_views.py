@@ -58,7 +58,7 @@ class DeltaFilePermissions(permissions.BasePermission):
 class ListCreateDeltasView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated, DeltaFilePermissions]
     serializer_class = DeltaSerializer
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def post(self, request, projectid):
         project_obj = Project.objects.get(id=projectid)
@@ -170,7 +170,7 @@ class ListCreateDeltasView(generics.ListCreateAPIView):
 class ListDeltasByDeltafileView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, DeltaFilePermissions]
     serializer_class = DeltaSerializer
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
         project_id = self.request.parser_context["kwargs"]["projectid"]
@@ -21,7 +21,7 @@ from qfieldcloud.core.utils import S3ObjectVersion, get_project_file_with_versio
 from qfieldcloud.core.utils2.audit import LogEntry, audit
 from qfieldcloud.core.utils2.sentry import report_serialization_diff_to_sentry
 from qfieldcloud.core.utils2.storage import (
-    get_attachment_dir_prefix,
+    is_attachment_file,
     purge_old_file_versions,
 )
 from rest_framework import permissions, serializers, status, views
@@ -117,7 +117,7 @@ class ListFilesView(views.APIView):
                 version_data["sha256"] = sha256sum
 
             if version.is_latest:
-                is_attachment = get_attachment_dir_prefix(project, filename) != ""
+                is_attachment = is_attachment_file(project, filename)
 
                 files[version.key]["name"] = filename
                 files[version.key]["size"] = version.size
@@ -306,7 +306,7 @@ class DownloadPushDeleteFileView(views.APIView):
             project = Project.objects.select_for_update().get(id=projectid)
             update_fields = ["data_last_updated_at", "file_storage_bytes"]
 
-            if get_attachment_dir_prefix(project, filename) == "" and (
+            if not is_attachment_file(project, filename) and (
                 is_qgis_project_file or project.project_filename is not None
             ):
                 if is_qgis_project_file:
@@ -51,7 +51,7 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = serializers.JobSerializer
     lookup_url_kwarg = "job_id"
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_serializer_by_job_type(self, job_type, *args, **kwargs):
         if job_type == Job.Type.DELTA_APPLY:
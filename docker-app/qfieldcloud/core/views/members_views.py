@@ -37,7 +37,7 @@ class ListCreateMembersViewPermissions(permissions.BasePermission):
 class ListCreateMembersView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated, ListCreateMembersViewPermissions]
     serializer_class = OrganizationMemberSerializer
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
         organization = self.request.parser_context["kwargs"]["organization"]
@@ -178,9 +178,7 @@ class LatestPackageDownloadFilesView(views.APIView):
 
         # files within attachment dirs that do not exist is the packaged files should be served
         # directly from the original data storage
-        if storage.get_attachment_dir_prefix(project, filename) and not check_s3_key(
-            key
-        ):
+        if storage.is_attachment_file(project, filename) and not check_s3_key(key):
             key = f"projects/{project_id}/files/{filename}"
 
         # NOTE the `expires` kwarg is sending the `Expires` header to the client, keep it a low value (in seconds).
@@ -209,8 +207,7 @@ class PackageUploadFilesView(views.APIView):
         key = utils.safe_join(f"projects/{project_id}/packages/{job_id}/", filename)
 
         request_file = request.FILES.get("file")
-        sha256sum = utils.get_sha256(request_file)
-        md5sum = utils.get_md5sum(request_file)
+        sha256sum, md5sum = utils.get_sha256_and_md5sum(request_file)
         metadata = {"Sha256sum": sha256sum}
 
         bucket = utils.get_s3_bucket()
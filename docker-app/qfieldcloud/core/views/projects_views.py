@@ -76,10 +76,12 @@ class ProjectViewSet(viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
     lookup_url_kwarg = "projectid"
     permission_classes = [permissions.IsAuthenticated, ProjectViewSetPermissions]
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
-        projects = Project.objects.for_user(self.request.user)
+        projects = Project.objects.for_user(
+            self.request.user
+        ).with_direct_collaborators_count()
 
         # In the list endpoint, by default we filter out public projects. They can be
         # included with the `include-public` query parameter.
@@ -132,7 +134,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
 class PublicProjectsListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ProjectSerializer
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
-        return Project.objects.for_user(self.request.user).filter(is_public=True)
+        return (
+            Project.objects.for_user(self.request.user)
+            .filter(is_public=True)
+            .with_direct_collaborators_count()
+        )
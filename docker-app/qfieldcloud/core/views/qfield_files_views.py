@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import PurePath
 
 from django.core.exceptions import ObjectDoesNotExist
@@ -10,6 +11,9 @@ from qfieldcloud.core.permissions_utils import check_supported_regarding_owner_a
 from rest_framework import permissions, views
 from rest_framework.response import Response
 
+# the maximum number of concurrent HEAD requests when obtaining the package files metadata
+LIST_FILES_MAX_WORKERS = 8
+
 
 class PackageViewPermissions(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -62,8 +66,9 @@ class PackageView(views.APIView):
                 serializer = serializers.ExportJobSerializer(export_job)
                 return Response(serializer.data)
 
-        if PackageJob.objects.filter(query).exists():
-            serializer = serializers.ExportJobSerializer(PackageJob.objects.get(query))
+        active_job = PackageJob.objects.filter(query).first()
+        if active_job:
+            serializer = serializers.ExportJobSerializer(active_job)
             return Response(serializer.data)
 
         export_job = PackageJob.objects.create(
@@ -115,18 +120,19 @@ class ListFilesView(views.APIView):
 
         export_prefix = f"projects/{projectid}/packages/{package_job.id}/"
 
+        objects = list(bucket.objects.filter(Prefix=export_prefix))
+
+        # NOTE the sha256 is stored in the object metadata and requires a HEAD request per file.
+        # The requests are independent and the S3 client is thread safe, so run them concurrently.
+        with ThreadPoolExecutor(max_workers=LIST_FILES_MAX_WORKERS) as executor:
+            sha256sums = list(
+                executor.map(utils.check_s3_key, [obj.key for obj in objects])
+            )
+
         files = []
-        for obj in bucket.objects.filter(Prefix=export_prefix):
+        for obj, sha256sum in zip(objects, sha256sums):
             path = PurePath(obj.key)
 
-            # We cannot be sure of the metadata's first letter case
-            # https://github.com/boto/boto3/issues/1709
-            metadata = obj.Object().metadata
-            if "sha256sum" in metadata:
-                sha256sum = metadata["sha256sum"]
-            else:
-                sha256sum = metadata["Sha256sum"]
-
             files.append(
                 {
                     # Get the path of the file relative to the export directory
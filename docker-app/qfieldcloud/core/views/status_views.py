@@ -24,7 +24,7 @@ class APIStatusView(views.APIView):
             results["storage"] = "ok"
             # Check if bucket exists (i.e. the connection works)
             try:
-                utils.get_s3_bucket()
+                utils.check_s3_bucket()
             except Exception:
                 results["storage"] = "error"
 
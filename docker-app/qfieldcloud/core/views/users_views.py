@@ -25,7 +25,7 @@ class ListUsersViewPermissions(permissions.BasePermission):
 class ListUsersView(generics.ListAPIView):
     serializer_class = PublicInfoUserSerializer
     permission_classes = [permissions.IsAuthenticated, ListUsersViewPermissions]
-    pagination_class = pagination.QfcLimitOffsetPagination()
+    pagination_class = pagination.QfcLimitOffsetPagination
 
     def get_queryset(self):
         params = self.request.GET